@@ -0,0 +1,145 @@
+# bench_dispatch.py
+"""Xabar dispatch narxini o'lchaydi: eski F.text == ... zanjiri va yangi dict lookup.
+
+Ishlatish: python bench_dispatch.py
+
+Har bir xabar uchun aiogram'ning TelegramEventObserver.trigger() dagi kabi
+handlerlar filtrlari tartib bilan tekshiriladi (handlerlarning o'zi chaqirilmaydi).
+"Oldin" varianti joriy handlers.router'dan eski (baseline) uslubda qayta quriladi:
+- har bir tugma uchun alohida F.text == ... handler, dispatch handler o'rnida
+  emas, balki funksiya handlers.py da turgan joyda (baseline'da dekorator aynan
+  shu yerda edi), ya'ni FSM state handlerlari bilan bir xil ketma-ketlikda;
+- IsAdmin filtri o'rniga eski usuldagi ro'yxat bo'yicha tekshiruv
+  (``user_id not in ADMINS``); u handler tanasida bo'lgani uchun mos kelishga
+  ta'sir qilmaydi, faqat narxi hisobga olinadi.
+Shu sababli handlerlar to'plami joriy (qism qo'shish, /slow bilan), tartibi esa
+baseline'dagidek.
+
+State'siz xabarlarda ikkala variant bir xil handlerni tanlashi tekshiriladi.
+FSM state ichidagi namunalarda esa yo'nalish ataylab farq qiladi: endi tugmalar
+state handlerlaridan oldin tekshiriladi va state'ni tozalaydi. Bunday qatorlarda
+ikkala tanlangan handler ham chiqariladi.
+"""
+import asyncio
+import time
+from datetime import datetime
+
+from aiogram import Bot, F
+from aiogram.dispatcher.event.handler import FilterObject, HandlerObject
+from aiogram.types import Chat, Message, User
+
+import handlers
+from handlers import ChannelState, SearchByName
+from keyboards import BTN_REMOVE_CHANNEL, BTN_SEARCH_CODE
+from config import ADMINS
+from filters import ADMIN_IDS, IsAdmin
+
+ROUNDS = 2000
+
+
+def legacy_admin_check(message: Message):
+    # Eski handler tanasidagi tekshiruv: xabar baribir shu handlerda to'xtardi
+    message.from_user.id not in ADMINS
+    return True
+
+
+def build_legacy_handlers():
+    legacy = []
+    for handler in handlers.router.message.handlers:
+        if handler.callback in (handlers.admin_button_dispatch, handlers.user_button_dispatch):
+            continue
+        filters = [
+            FilterObject(legacy_admin_check) if isinstance(f.callback, IsAdmin) else f
+            for f in handler.filters or []
+        ]
+        legacy.append(HandlerObject(callback=handler.callback, filters=filters))
+    for text, callback in handlers.ADMIN_BUTTONS.items():
+        legacy.append(HandlerObject(
+            callback=callback,
+            filters=[FilterObject(F.text == text), FilterObject(legacy_admin_check)]
+        ))
+    for text, callback in handlers.USER_BUTTONS.items():
+        legacy.append(HandlerObject(callback=callback, filters=[FilterObject(F.text == text)]))
+    # Baseline'dagi ro'yxatdan o'tish tartibi = handlers.py dagi funksiyalar tartibi
+    legacy.sort(key=lambda h: h.callback.__code__.co_firstlineno)
+    return legacy
+
+
+def make_message(text, user_id):
+    user = User(id=user_id, is_bot=False, first_name="bench")
+    return Message(
+        message_id=1, date=datetime.now(), chat=Chat(id=user_id, type="private"),
+        from_user=user, text=text
+    )
+
+
+async def find_handler(handler_list, message, kwargs):
+    for handler in handler_list:
+        result, data = await handler.check(message, **kwargs)
+        if result:
+            # Dispatch handler bo'lsa, haqiqiy tugma handlerini qaytaramiz
+            return data.get("button_handler", handler.callback)
+    return None
+
+
+def make_kwargs(bot, message, raw_state):
+    return {"bot": bot, "event_from_user": message.from_user, "raw_state": raw_state}
+
+
+async def measure(handler_list, message, kwargs):
+    started = time.perf_counter_ns()
+    for _ in range(ROUNDS):
+        await find_handler(handler_list, message, kwargs)
+    return (time.perf_counter_ns() - started) / ROUNDS / 1000
+
+
+async def main():
+    admin_id = next(iter(ADMIN_IDS))
+    user_id = admin_id + 1
+    samples = [(text, admin_id, None) for text in handlers.ADMIN_BUTTONS]
+    samples += [(text, user_id, None) for text in handlers.USER_BUTTONS]
+    samples += [("1234", user_id, None), ("salom", user_id, None)]
+    # FSM state ichida bosilgan tugmalar
+    samples += [
+        (BTN_REMOVE_CHANNEL, admin_id, ChannelState.username.state),
+        (BTN_SEARCH_CODE, user_id, SearchByName.query.state),
+    ]
+
+    bot = Bot(token="42:BENCH")
+    legacy = build_legacy_handlers()
+    current = handlers.router.message.handlers
+    print(f"Handlerlar soni: oldin {len(legacy)}, hozir {len(current)}\n")
+    print(f"{'xabar':<28}{'oldin, µs':>12}{'hozir, µs':>12}")
+
+    total_before = total_after = 0.0
+    routing_changes = []
+    for text, uid, raw_state in samples:
+        message = make_message(text, uid)
+        kwargs = make_kwargs(bot, message, raw_state)
+        legacy_handler = await find_handler(legacy, message, kwargs)
+        current_handler = await find_handler(current, message, kwargs)
+        if raw_state is None:
+            # State'siz xabarlarda ikkala variant ham bir xil handlerni tanlashi kerak
+            assert legacy_handler is current_handler, text
+        elif legacy_handler is not current_handler:
+            routing_changes.append(
+                f"{text} [{raw_state}]: oldin {legacy_handler.__name__}, hozir {current_handler.__name__}"
+            )
+        before = await measure(legacy, message, kwargs)
+        after = await measure(current, message, kwargs)
+        total_before += before
+        total_after += after
+        label = text if raw_state is None else f"{text} [state]"
+        print(f"{label:<28}{before:>12.2f}{after:>12.2f}")
+
+    n = len(samples)
+    print(f"\n{'o‘rtacha':<28}{total_before / n:>12.2f}{total_after / n:>12.2f}")
+    if routing_changes:
+        print("\nYo'nalishi o'zgargan (ataylab) namunalar:")
+        for line in routing_changes:
+            print(f"  {line}")
+    await bot.session.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -10,6 +10,7 @@ from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_applicati
 # -----------------------------------
 
 from handlers import router
+from tracing import TracingMiddleware, setup_logging, stop_logging
 from database import create_tables
 from config import TOKEN, DEFAULT_PARSE_MODE
 
@@ -44,10 +45,12 @@ async def on_startup(bot: Bot) -> None:
 
 async def main() -> None:
     create_tables()
+    setup_logging()
     
     # TOKEN ni env-variable dan olishni birinchi o'ringa qo'yamiz
     bot = Bot(token=BOT_TOKEN, default=DefaultBotProperties(parse_mode=DEFAULT_PARSE_MODE))
     dp = Dispatcher(storage=MemoryStorage())
+    dp.update.outer_middleware(TracingMiddleware())
     dp.include_router(router)
     
     # /start buyrug'ini o'rnatish
@@ -78,7 +81,11 @@ async def main() -> None:
         await site.start()
         
         print(f"🤖 Veb-server {WEB_SERVER_HOST}:{WEB_SERVER_PORT} portida tinglamoqda.")
-        await asyncio.Event().wait() # Serverni doimiy ushlab turish
+        try:
+            await asyncio.Event().wait() # Serverni doimiy ushlab turish
+        finally:
+            # Webhook rejimida dp.shutdown chaqirilmaydi: navbatdagi loglarni shu yerda chiqaramiz
+            stop_logging()
         
     else:
         # --- LONG POLLING ISHLATISH MANTIG'I (Favqulodda holatda) ---
@@ -87,6 +94,7 @@ async def main() -> None:
             await dp.start_polling(bot)
         finally:
             await bot.session.close()
+            stop_logging()
 
 
 if __name__ == "__main__":
@@ -5,4 +5,8 @@ DB_NAME = "cinema.db"
 
 # Qo'shimcha sozlamalar
 ADMIN_PHONE = "+998950897901"
-DEFAULT_PARSE_MODE = "HTML"
\ No newline at end of file
+DEFAULT_PARSE_MODE = "HTML"
+
+# Tracing: shu millisekunddan uzoq davom etgan update'lar "sekin" deb loglanadi
+SLOW_UPDATE_MS = 1000
+SLOW_LOG_SIZE = 20
@@ -29,6 +29,21 @@ def create_tables():
         )
     """)
 
+    # Serial qismlari: bitta kod ortidagi qo'shimcha fayllar (1-qism movies.file_id da).
+    # Tartib admin yuborgan xabarning (chat_id, message_id) si bo'yicha: webhook rejimida
+    # albom elementlari parallel va aralash tartibda kelishi mumkin, message_id esa
+    # faqat bitta chat ichida unikal (har bir admin o'z chatidan yuboradi).
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS episodes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            movie_id INTEGER NOT NULL,
+            chat_id INTEGER NOT NULL,
+            message_id INTEGER NOT NULL,
+            file_id TEXT,
+            UNIQUE (movie_id, chat_id, message_id)
+        )
+    """)
+
     cur.execute("""
         CREATE TABLE IF NOT EXISTS channels (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -75,15 +90,49 @@ def add_movie(title, genre, year, description, file_id, code=None):
     conn.close()
     return movie_id, code
 
-def get_movie_by_code(code):
+def get_movie_with_parts(code):
+    """Kino ma'lumotlari va barcha qismlar file_id larini bitta so'rovda qaytaradi."""
     conn = connect()
     cur = conn.cursor()
     cur.execute("""
-        SELECT title, genre, year, description, file_id, views FROM movies WHERE code = ?
+        SELECT m.title, m.genre, m.year, m.description, m.file_id, m.views, e.file_id
+        FROM movies m
+        LEFT JOIN episodes e ON e.movie_id = m.id
+        WHERE m.code = ?
+        ORDER BY e.chat_id, e.message_id
     """, (code,))
+    rows = cur.fetchall()
+    conn.close()
+    if not rows:
+        return None
+    title, genre, year, description, file_id, views, _ = rows[0]
+    file_ids = [file_id] + [row[6] for row in rows if row[6] is not None]
+    return title, genre, year, description, file_ids, views
+
+def get_movie_id_by_code(code):
+    conn = connect()
+    cur = conn.cursor()
+    cur.execute("SELECT id FROM movies WHERE code = ?", (code,))
     row = cur.fetchone()
     conn.close()
-    return row  # None or tuple
+    return row[0] if row else None
+
+def add_episode(movie_id, file_id, chat_id, message_id):
+    """Kinoga qism qo'shadi. (yozildimi, jami qismlar soni) qaytaradi."""
+    conn = connect()
+    cur = conn.cursor()
+    # Telegram qayta yuborgan bir xil xabar ikkinchi marta yozilmaydi
+    cur.execute(
+        "INSERT OR IGNORE INTO episodes (movie_id, chat_id, message_id, file_id) VALUES (?, ?, ?, ?)",
+        (movie_id, chat_id, message_id, file_id)
+    )
+    inserted = cur.rowcount > 0
+    conn.commit()
+    cur.execute("SELECT COUNT(*) FROM episodes WHERE movie_id = ?", (movie_id,))
+    # 1-qism movies.file_id da saqlanadi
+    total = cur.fetchone()[0] + 1
+    conn.close()
+    return inserted, total
 
 def search_movies_by_title(query):
     conn = connect()
@@ -106,8 +155,9 @@ def delete_movie_by_id(movie_id):
     conn = connect()
     cur = conn.cursor()
     cur.execute("DELETE FROM movies WHERE id = ?", (movie_id,))
-    conn.commit()
     deleted = cur.rowcount
+    cur.execute("DELETE FROM episodes WHERE movie_id = ?", (movie_id,))
+    conn.commit()
     conn.close()
     return deleted > 0
 
@@ -0,0 +1,31 @@
+# filters.py
+from aiogram.filters import BaseFilter
+from aiogram.types import Message, User
+
+from config import ADMINS
+
+# Har bir xabarda ro'yxat bo'ylab yurmaslik uchun set
+ADMIN_IDS = frozenset(ADMINS)
+
+
+class IsAdmin(BaseFilter):
+    """Update yuboruvchisi admin ekanini tekshiradi."""
+
+    async def __call__(self, event, event_from_user: User | None = None) -> bool:
+        return event_from_user is not None and event_from_user.id in ADMIN_IDS
+
+
+class TextButton(BaseFilter):
+    """Tugma matnini bitta dict lookup orqali handlerga moslaydi.
+
+    Topilgan handler ``button_handler`` nomi bilan handlerga uzatiladi.
+    """
+
+    def __init__(self, routes: dict):
+        self.routes = routes
+
+    async def __call__(self, message: Message):
+        handler = self.routes.get(message.text)
+        if handler is None:
+            return False
+        return {"button_handler": handler}
@@ -1,22 +1,40 @@
 # handlers.py (Tuzatilgan versiya)
 from aiogram import Router, F
 from aiogram.filters import CommandStart, Command
-from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
+from aiogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery, InputMediaVideo
 from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import StatesGroup, State
 from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError 
 import re 
+import html
 
-from config import ADMINS
+from filters import ADMIN_IDS, IsAdmin, TextButton
 from database import (
-    add_user, add_movie, get_movie_by_code, search_movies_by_title,
+    add_user, add_movie, get_movie_with_parts, search_movies_by_title,
     delete_movie_by_id, list_movies, add_channel, remove_channel, list_channels,
-    list_users, update_movie, increment_views_by_code
+    list_users, update_movie, increment_views_by_code, get_movie_id_by_code, add_episode
 )
-from keyboards import admin_keyboard, user_keyboard, make_subscription_markup
+from keyboards import (
+    admin_keyboard, user_keyboard, make_subscription_markup, episodes_done_keyboard,
+    BTN_ADD_MOVIE, BTN_ADD_EPISODE, BTN_LIST_MOVIES, BTN_ADD_CHANNEL, BTN_REMOVE_CHANNEL,
+    BTN_SEND_AD, BTN_EXIT, BTN_SEARCH_CODE, BTN_SEARCH_NAME, BTN_EPISODES_DONE
+)
+from tracing import stage, record_error, slow_updates
 
 router = Router()
 
+# Statik klaviatura tugmalari: matn -> handler. Har bir xabar uchun F.text == ...
+# zanjiri o'rniga bitta dict lookup bajariladi (qarang: TextButton).
+ADMIN_BUTTONS = {}
+USER_BUTTONS = {}
+
+def button(routes, text):
+    """Handlerni tugma matni bo'yicha dispatch jadvaliga qo'shadi."""
+    def decorator(func):
+        routes[text] = func
+        return func
+    return decorator
+
 # --- States ---
 class AddMovie(StatesGroup):
     title = State()
@@ -25,6 +43,10 @@ class AddMovie(StatesGroup):
     description = State()
     video = State()
 
+class AddEpisode(StatesGroup):
+    code = State()
+    video = State()
+
 class DeleteMovie(StatesGroup):
     movie_id = State()
 
@@ -61,18 +83,58 @@ async def check_user_subscription(bot, user_id, channels):
             not_subscribed.append(ch)
     return not_subscribed
 
+# Telegram send_media_group bitta chaqiruvda ko'pi bilan 10 ta fayl qabul qiladi
+MEDIA_GROUP_LIMIT = 10
+
+async def send_movie_files(bot, chat_id, title, code, file_ids):
+    """Bitta faylni send_video, ko'p qismli serialni 10 talik albomlar bilan yuboradi."""
+    parse_mode = bot.default.parse_mode
+    if len(file_ids) == 1:
+        await bot.send_video(
+            chat_id=chat_id,
+            video=file_ids[0],
+            caption=f"🎬 {title} | Kod: <b>{code}</b>",
+            parse_mode=parse_mode
+        )
+        return
+
+    total = len(file_ids)
+    for start in range(0, total, MEDIA_GROUP_LIMIT):
+        batch = file_ids[start:start + MEDIA_GROUP_LIMIT]
+        end = start + len(batch)
+        media = [InputMediaVideo(media=file_id) for file_id in batch]
+        # Albom sarlavhasi birinchi elementning caption'i orqali ko'rsatiladi
+        media[0] = InputMediaVideo(
+            media=batch[0],
+            caption=f"🎬 {title} | Kod: <b>{code}</b>\n📼 Qismlar: {start + 1}–{end} / {total}",
+            parse_mode=parse_mode
+        )
+        if len(media) == 1:
+            # Albom kamida 2 ta fayldan iborat bo'lishi kerak
+            await bot.send_video(
+                chat_id=chat_id,
+                video=batch[0],
+                caption=media[0].caption,
+                parse_mode=parse_mode
+            )
+        else:
+            await bot.send_media_group(chat_id=chat_id, media=media)
+
 async def handle_movie_code_search(message: Message, code: str):
     """Kino kodini qidirish va yuborishning asosiy logikasi."""
-    movie = get_movie_by_code(code)
+    with stage("db_lookup"):
+        movie = get_movie_with_parts(code)
     
     if not movie:
         await message.answer("❌ Bunday koddagi kino topilmadi.")
         return
 
-    channels = list_channels()
+    with stage("db_lookup"):
+        channels = list_channels()
     if channels:
         # Obuna tekshiruvi
-        not_subscribed = await check_user_subscription(message.bot, message.from_user.id, channels)
+        with stage("subscription_check"):
+            not_subscribed = await check_user_subscription(message.bot, message.from_user.id, channels)
         
         if not_subscribed:
             markup = make_subscription_markup(channels)
@@ -83,31 +145,31 @@ async def handle_movie_code_search(message: Message, code: str):
             return
 
     # Obuna sharti bajarilgan yoki kanal yo'q. Kinoni yuboramiz.
-    title, genre, year, description, file_id, views = movie
+    title, genre, year, description, file_ids, views = movie
     
     # Ko'rishlar sonini avvalroq aniqlash
     new_views = views + 1
     
     text = f"🎬 <b>{title}</b>\n📚 Janr: {genre}\n📅 Yil: {year}\n📝 Tavsif: {description}\n👁️ Ko'rishlar: {new_views}"
+    if len(file_ids) > 1:
+        text += f"\n📼 Qismlar soni: {len(file_ids)}"
     await message.answer(text)
     
     try:
-        caption_text = f"🎬 {title} | Kod: <b>{code}</b>"
-        
-        await message.bot.send_video(
-            chat_id=message.from_user.id,
-            video=file_id,
-            caption=caption_text,
-            parse_mode=message.bot.default.parse_mode
-        )
-        increment_views_by_code(code)
-    except TelegramForbiddenError:
+        with stage("send_video"):
+            await send_movie_files(message.bot, message.from_user.id, title, code, file_ids)
+        with stage("view_increment"):
+            increment_views_by_code(code)
+    except TelegramForbiddenError as e:
+        record_error(e)
         # Bot foydalanuvchiga xabar yubora olmasa (bloklangan)
         await message.answer("❗️ Videoni yuborishda xatolik: Bot sizga yubora olmadi. Iltimos, botni blokdan chiqaring.")
     except TelegramBadRequest as e:
+        record_error(e)
         # File_ID noto'g'ri yoki Telegram serverlarida o'chirilgan
         await message.answer(f"❌ Videoni yuborishda jiddiy xatolik (File ID muammo). \nSabab: <code>{e}</code>. Adminlar yuklangan kinoni tekshirsin.")
     except Exception as e:
+        record_error(e)
         # Boshqa umumiy xatolar (tarmoq uzilishi, timeout)
         await message.answer(f"❗️ Videoni yubishda noma'lum muammo yuz berdi. \nSabab: <code>{type(e).__name__}: {e}</code>")
         
@@ -118,7 +180,7 @@ async def start_bot(message: Message, state: FSMContext):
     await state.clear() 
     add_user(message.from_user.id)
 
-    if message.from_user.id in ADMINS:
+    if message.from_user.id in ADMIN_IDS:
         await message.answer("👋 Admin panelga xush kelibsiz!", reply_markup=admin_keyboard())
         return
 
@@ -152,11 +214,25 @@ async def check_subscriptions(callback: CallbackQuery):
         await callback.message.delete()
 
 
+# --- statik tugmalar dispatch'i ---
+# Tugmalar FSM state handlerlaridan oldin tekshiriladi: har bir tugma yangi amalni
+# boshlaydi, shuning uchun avvalgi (tugallanmagan) state tozalanadi. Aks holda
+# masalan ChannelState.username ichida "➖ Kanal o'chirish" bosilsa, keyingi
+# "@Name" javobini kanal qo'shish handleri ushlab qolardi.
+@router.message(TextButton(ADMIN_BUTTONS), IsAdmin())
+async def admin_button_dispatch(message: Message, state: FSMContext, button_handler):
+    await state.clear()
+    await button_handler(message, state)
+
+@router.message(TextButton(USER_BUTTONS))
+async def user_button_dispatch(message: Message, state: FSMContext, button_handler):
+    await state.clear()
+    await button_handler(message, state)
+
+
 # ---------------- Admin: add movie ----------------
-@router.message(F.text == "📥 Kino qo'shish")
+@button(ADMIN_BUTTONS, BTN_ADD_MOVIE)
 async def admin_add_movie(message: Message, state: FSMContext):
-    if message.from_user.id not in ADMINS:
-        return
     await state.set_state(AddMovie.title)
     await message.answer("🎞 Sarlavha kiriting:")
 
@@ -222,11 +298,63 @@ async def add_video(message: Message, state: FSMContext):
 async def add_video_invalid(message: Message):
     await message.answer("❗️ Iltimos, faqat video fayl yuboring.")
 
-# ---------------- Admin: list / delete / edit / exit ----------------
-@router.message(F.text == "🎞 Kinolar ro'yxati")
-async def admin_list_movies(message: Message):
-    if message.from_user.id not in ADMINS:
+# ---------------- Admin: add episodes (serial qismlari) ----------------
+@button(ADMIN_BUTTONS, BTN_ADD_EPISODE)
+async def admin_add_episode_start(message: Message, state: FSMContext):
+    await state.set_state(AddEpisode.code)
+    await message.answer("🎞 Qism qo'shiladigan kino kodini kiriting:")
+
+@router.message(AddEpisode.code)
+async def admin_add_episode_code(message: Message, state: FSMContext):
+    code = (message.text or "").strip()
+    if code.lower() in ["/cancel", "bekor qilish"]:
+        await state.clear()
+        await message.answer("❌ Qism qo'shish bekor qilindi.", reply_markup=admin_keyboard())
+        return
+
+    movie_id = get_movie_id_by_code(code)
+    if movie_id is None:
+        await message.answer("❌ Bunday koddagi kino topilmadi. Qayta kiriting:")
+        return
+
+    await state.update_data(movie_id=movie_id, code=code)
+    await state.set_state(AddEpisode.video)
+    await message.answer(
+        "📤 Qismlarni tartib bilan yuboring (albom ham bo'ladi). Tugatgach ✅ Tayyor tugmasini bosing.",
+        reply_markup=episodes_done_keyboard()
+    )
+
+@router.message(AddEpisode.video, F.content_type.in_({'video', 'document'}))
+async def admin_add_episode_video(message: Message, state: FSMContext):
+    file_id = None
+    if message.video:
+        file_id = message.video.file_id
+    elif message.document and message.document.mime_type and message.document.mime_type.startswith('video/'):
+        file_id = message.document.file_id
+
+    if not file_id:
+        await message.answer("❗️ Videodan fayl ID ni olib bo'lmadi. Qayta urinib ko'ring.")
+        return
+
+    data = await state.get_data()
+    inserted, total = add_episode(data.get("movie_id"), file_id, message.chat.id, message.message_id)
+    if not inserted:
+        await message.answer(f"⚠️ Bu qism allaqachon qo'shilgan. Jami qismlar: {total}")
+        return
+    await message.answer(f"✅ Qism qabul qilindi. Jami qismlar: {total}")
+
+@router.message(AddEpisode.video)
+async def admin_add_episode_done(message: Message, state: FSMContext):
+    if message.text not in [BTN_EPISODES_DONE, "/cancel"]:
+        await message.answer("❗️ Iltimos, video yuboring yoki ✅ Tayyor tugmasini bosing.")
         return
+    data = await state.get_data()
+    await state.clear()
+    await message.answer(f"✅ Kod <b>{data.get('code')}</b> uchun qismlar saqlandi.", reply_markup=admin_keyboard())
+
+# ---------------- Admin: list / delete / edit / exit ----------------
+@button(ADMIN_BUTTONS, BTN_LIST_MOVIES)
+async def admin_list_movies(message: Message, state: FSMContext):
     movies = list_movies()
     if not movies:
         await message.answer("📭 Kinolar topilmadi.")
@@ -236,10 +364,28 @@ async def admin_list_movies(message: Message):
         text += f"ID: {m[0]} | {m[1]} ({m[3]}) — Kod: <b>{m[4]}</b>\n" 
     await message.answer(text)
 
-@router.message(F.text == "⬅️ Chiqish")
-async def admin_exit(message: Message, state: FSMContext):
-    if message.from_user.id not in ADMINS:
+@router.message(Command("slow"), IsAdmin())
+async def admin_slow_updates(message: Message):
+    entries = slow_updates.slowest()
+    if not entries:
+        await message.answer("📭 Hali sekin update'lar yozilmagan.")
         return
+    # Telegram xabar limiti 4096 belgi: xatolar qisqartiriladi, matn bo'laklab yuboriladi
+    text = "🐢 Eng sekin update'lar:\n\n"
+    for e in entries:
+        stages = ", ".join(f"{name}={ms}ms" for name, ms in e["stages_ms"].items()) or "-"
+        line = f"<code>{e['trace_id']}</code> | {e['total_ms']}ms | {stages}\n"
+        if e["error"]:
+            error = e["error"] if len(e["error"]) <= 100 else e["error"][:100] + "…"
+            line += f"   ❗️ {html.escape(error)}\n"
+        if len(text) + len(line) > 4000:
+            await message.answer(text)
+            text = ""
+        text += line
+    await message.answer(text)
+
+@button(ADMIN_BUTTONS, BTN_EXIT)
+async def admin_exit(message: Message, state: FSMContext):
     await state.clear()
     await message.answer("👋 Admin panelidan chiqildi. Endi siz foydalanuvchi klaviaturasini ko'rasiz.", reply_markup=user_keyboard())
 
@@ -248,10 +394,8 @@ async def admin_exit(message: Message, state: FSMContext):
 # ... delete movie, edit movie, channel, ads handlers... 
 
 # ---------------- Channels ----------------
-@router.message(F.text == "➕ Kanal qo'shish")
+@button(ADMIN_BUTTONS, BTN_ADD_CHANNEL)
 async def admin_add_channel_start(message: Message, state: FSMContext):
-    if message.from_user.id not in ADMINS:
-        return
     await state.set_state(ChannelState.username)
     await message.answer("➕ Kanal link yoki username kiriting (https://t.me/Name yoki @Name):")
 
@@ -268,10 +412,8 @@ async def admin_add_channel_save(message: Message, state: FSMContext):
         await message.answer("❌ Kanal allaqachon mavjud yoki xato.")
     await state.clear()
 
-@router.message(F.text == "➖ Kanal o'chirish")
-async def admin_remove_channel_start(message: Message):
-    if message.from_user.id not in ADMINS:
-        return
+@button(ADMIN_BUTTONS, BTN_REMOVE_CHANNEL)
+async def admin_remove_channel_start(message: Message, state: FSMContext):
     channels = list_channels()
     if not channels:
         await message.answer("🗑 Hozirda hech qanday kanal qo'shilmagan.")
@@ -281,11 +423,8 @@ async def admin_remove_channel_start(message: Message):
     text += "\n".join(channels)
     await message.answer(text)
 
-@router.message(F.text.startswith(("@", "https://t.me/", "t.me/")))
+@router.message(F.text.startswith(("@", "https://t.me/", "t.me/")), IsAdmin())
 async def admin_remove_channel_confirm(message: Message):
-    if message.from_user.id not in ADMINS:
-        return
-        
     raw = message.text.strip()
     username = re.sub(r'https?://t\.me/', '@', raw, flags=re.IGNORECASE).strip()
     if not username.startswith('@'):
@@ -297,10 +436,8 @@ async def admin_remove_channel_confirm(message: Message):
         await message.answer(f"❌ Kanal <b>{username}</b> topilmadi.")
 
 # ---------------- Ads ----------------
-@router.message(F.text == "📢 Reklama yuborish")
+@button(ADMIN_BUTTONS, BTN_SEND_AD)
 async def admin_send_ad_start(message: Message, state: FSMContext):
-    if message.from_user.id not in ADMINS:
-        return
     await state.set_state(SendAd.text)
     await message.answer("📢 Reklama matnini kiriting:")
 
@@ -325,7 +462,7 @@ async def admin_send_ad_confirm(message: Message, state: FSMContext):
     await state.clear()
 
 # ---------------- User: search by code (tugma orqali) ----------------
-@router.message(F.text == "🎬 Kino izlash")
+@button(USER_BUTTONS, BTN_SEARCH_CODE)
 async def user_search_start(message: Message, state: FSMContext):
     await state.set_state(SearchMovie.code)
     await message.answer("🎬 Iltimos, kinoning kodini kiriting (4 xonali raqam):")
@@ -349,7 +486,7 @@ async def user_search_inline_code(message: Message, state: FSMContext):
     if current_state:
         return
     
-    if message.from_user.id in ADMINS:
+    if message.from_user.id in ADMIN_IDS:
         return
         
     code = message.text.strip()
@@ -357,7 +494,7 @@ async def user_search_inline_code(message: Message, state: FSMContext):
 
 
 # ---------------- User: search by name ----------------
-@router.message(F.text == "🔎 Nom bo'yicha qidirish")
+@button(USER_BUTTONS, BTN_SEARCH_NAME)
 async def user_search_name_start(message: Message, state: FSMContext):
     await state.set_state(SearchByName.query)
     await message.answer("🔎 Qidiruv uchun kinoning nomidan bir qismini kiriting:")
@@ -391,7 +528,7 @@ async def final_catch_all_handler(message: Message, state: FSMContext):
 
     if not current_state:
         # State mavjud emas
-        if message.from_user.id in ADMINS:
+        if message.from_user.id in ADMIN_IDS:
             # Admin hech qanday buyruq/tugmaga mos kelmagan matn yubordi
             await message.answer("❓ Tushunarsiz buyruq. Admin panelidan foydalanish uchun to'g'ri tugmalarni bosing.")
         else:
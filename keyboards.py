@@ -1,15 +1,29 @@
 # keyboards.py
 from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
 
+# Tugma matnlari (handlers.py dagi dispatch jadvallari ham shularni ishlatadi)
+BTN_ADD_MOVIE = "📥 Kino qo'shish"
+BTN_ADD_EPISODE = "🎞 Qism qo'shish"
+BTN_LIST_MOVIES = "🎞 Kinolar ro'yxati"
+BTN_EDIT_MOVIE = "✏️ Kino tahrirlash"
+BTN_DELETE_MOVIE = "🗑 Kino o'chirish"
+BTN_ADD_CHANNEL = "➕ Kanal qo'shish"
+BTN_REMOVE_CHANNEL = "➖ Kanal o'chirish"
+BTN_SEND_AD = "📢 Reklama yuborish"
+BTN_EXIT = "⬅️ Chiqish"
+BTN_SEARCH_CODE = "🎬 Kino izlash"
+BTN_SEARCH_NAME = "🔎 Nom bo'yicha qidirish"
+BTN_EPISODES_DONE = "✅ Tayyor"
+
 def admin_keyboard():
     return ReplyKeyboardMarkup(
         keyboard=[
-            [KeyboardButton(text="📥 Kino qo'shish")],
-            [KeyboardButton(text="🎞 Kinolar ro'yxati"), KeyboardButton(text="✏️ Kino tahrirlash")],
-            [KeyboardButton(text="🗑 Kino o'chirish")],
-            [KeyboardButton(text="➕ Kanal qo'shish"), KeyboardButton(text="➖ Kanal o'chirish")],
-            [KeyboardButton(text="📢 Reklama yuborish")],
-            [KeyboardButton(text="⬅️ Chiqish")]
+            [KeyboardButton(text=BTN_ADD_MOVIE), KeyboardButton(text=BTN_ADD_EPISODE)],
+            [KeyboardButton(text=BTN_LIST_MOVIES), KeyboardButton(text=BTN_EDIT_MOVIE)],
+            [KeyboardButton(text=BTN_DELETE_MOVIE)],
+            [KeyboardButton(text=BTN_ADD_CHANNEL), KeyboardButton(text=BTN_REMOVE_CHANNEL)],
+            [KeyboardButton(text=BTN_SEND_AD)],
+            [KeyboardButton(text=BTN_EXIT)]
         ],
         resize_keyboard=True
     )
@@ -17,7 +31,15 @@ def admin_keyboard():
 def user_keyboard():
     return ReplyKeyboardMarkup(
         keyboard=[
-            [KeyboardButton(text="🎬 Kino izlash"), KeyboardButton(text="🔎 Nom bo'yicha qidirish")],
+            [KeyboardButton(text=BTN_SEARCH_CODE), KeyboardButton(text=BTN_SEARCH_NAME)],
+        ],
+        resize_keyboard=True
+    )
+
+def episodes_done_keyboard():
+    return ReplyKeyboardMarkup(
+        keyboard=[
+            [KeyboardButton(text=BTN_EPISODES_DONE)],
         ],
         resize_keyboard=True
     )
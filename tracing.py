@@ -0,0 +1,166 @@
+# tracing.py
+import heapq
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from aiogram import BaseMiddleware
+from aiogram.types.update import UpdateTypeLookupError
+
+from config import SLOW_UPDATE_MS, SLOW_LOG_SIZE
+
+logger = logging.getLogger("cinema_bot.trace")
+
+_current_trace = ContextVar("current_trace", default=None)
+_trace_counter = itertools.count(1)
+_trace_prefix = f"{os.getpid():x}"
+_listener = None
+
+
+class Trace:
+    """Bitta update uchun trace: id, bosqichlar vaqti (ns) va xatolik."""
+    __slots__ = ("seq", "update", "started", "stages", "error")
+
+    def __init__(self, update):
+        self.seq = next(_trace_counter)
+        self.update = update
+        self.started = time.perf_counter_ns()
+        self.stages = {}
+        self.error = None
+
+    @property
+    def trace_id(self):
+        return f"{_trace_prefix}-{self.seq:x}"
+
+    @property
+    def event_type(self):
+        # Update turi faqat serializatsiyada aniqlanadi; noma'lum turdagi update
+        # (aiogram'dan yangiroq) trace'ni buzmasligi kerak
+        try:
+            return getattr(self.update, "event_type", None)
+        except UpdateTypeLookupError:
+            return None
+
+    def as_dict(self, total_ns):
+        return {
+            "trace_id": self.trace_id,
+            "update_id": getattr(self.update, "update_id", None),
+            "event": self.event_type,
+            "total_ms": round(total_ns / 1e6, 3),
+            "stages_ms": {name: round(ns / 1e6, 3) for name, ns in self.stages.items()},
+            "error": self.error,
+        }
+
+
+class SlowUpdateLog:
+    """Eng sekin N ta update'ni saqlaydi (min-heap, eng tezi birinchi chiqariladi)."""
+
+    def __init__(self, size):
+        self.size = size
+        self._heap = []
+
+    def add(self, total_ns, trace):
+        if len(self._heap) < self.size:
+            heapq.heappush(self._heap, (total_ns, trace.seq, trace))
+        elif total_ns > self._heap[0][0]:
+            heapq.heapreplace(self._heap, (total_ns, trace.seq, trace))
+
+    def slowest(self):
+        return [trace.as_dict(total_ns) for total_ns, _, trace in sorted(self._heap, reverse=True)]
+
+    def clear(self):
+        self._heap.clear()
+
+
+slow_updates = SlowUpdateLog(SLOW_LOG_SIZE)
+
+
+@contextmanager
+def stage(name):
+    """Joriy update ichidagi bosqich vaqtini o'lchaydi (trace bo'lmasa hech narsa qilmaydi)."""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    started = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        trace.stages[name] = trace.stages.get(name, 0) + time.perf_counter_ns() - started
+
+
+def record_error(exc):
+    """Foydalanuvchiga matn sifatida ko'rsatilgan xatoni trace'ga yozib qo'yadi."""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.error = f"{type(exc).__name__}: {exc}"
+
+
+class TracingMiddleware(BaseMiddleware):
+    """Har bir update'ga trace id beradi va umumiy/bosqich vaqtlarini yozadi."""
+
+    def __init__(self, slow_ms=SLOW_UPDATE_MS, slow_log=slow_updates):
+        self.slow_ns = int(slow_ms * 1e6)
+        self.slow_log = slow_log
+
+    async def __call__(self, handler, event, data):
+        trace = Trace(event)
+        token = _current_trace.set(trace)
+        try:
+            return await handler(event, data)
+        except Exception as e:
+            trace.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_trace.reset(token)
+            total_ns = time.perf_counter_ns() - trace.started
+            self.slow_log.add(total_ns, trace)
+            # JSON faqat kerak bo'lganda (sekin, xatolik yoki DEBUG) tayyorlanadi
+            if trace.error is not None:
+                logger.error("update failed", extra={"trace": trace.as_dict(total_ns)})
+            elif total_ns >= self.slow_ns:
+                logger.warning("slow update", extra={"trace": trace.as_dict(total_ns)})
+            elif logger.isEnabledFor(logging.DEBUG):
+                logger.debug("update", extra={"trace": trace.as_dict(total_ns)})
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        trace = getattr(record, "trace", None)
+        if trace is not None:
+            payload.update(trace)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def setup_logging(level=logging.INFO):
+    """Trace loglarini navbat orqali alohida oqimda JSON ko'rinishida chiqaradi."""
+    global _listener
+    if _listener is not None:
+        return
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JsonFormatter())
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(level)
+    logger.propagate = False
+    _listener.start()
+
+
+def stop_logging():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None